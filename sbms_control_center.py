@@ -13,6 +13,7 @@ Date: December 2025
 Requirements:
 - Python 3.8+
 - PyQt6 (pip install PyQt6)
+- orjson (optional, faster message decoding: pip install orjson)
 """
 
 import json
@@ -26,6 +27,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 try:
     from PyQt6.QtWidgets import (
         QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -51,6 +57,23 @@ LOG_FILE = "control_center.log"
 UPDATE_INTERVAL = 1000  # milliseconds
 RECONNECT_INTERVAL = 3000  # milliseconds
 SOCKET_TIMEOUT = 5  # seconds
+RECV_BUFFER_SIZE = 65536  # bytes, grows for larger responses
+
+# ============================================================================
+# Message Encoding
+# ============================================================================
+
+if orjson is not None:
+    # C codec; loads() parses straight out of the receive buffer's view
+    encode_json = orjson.dumps
+    decode_json = orjson.loads
+else:
+    def encode_json(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    def decode_json(data):
+        # json.loads() rejects memoryview
+        return json.loads(bytes(data))
 
 # ============================================================================
 # Logging Setup
@@ -79,6 +102,8 @@ class HostConnection:
         self.lock = threading.Lock()
         self.reconnect_attempts = 0
         self.max_reconnect_attempts = 5
+        self.rx_buffer = bytearray(RECV_BUFFER_SIZE)
+        self.rx_view = memoryview(self.rx_buffer)
     
     def connect(self) -> bool:
         """Connect to Windows host with proper socket configuration"""
@@ -142,27 +167,30 @@ class HostConnection:
                     return None
                 
                 # Send request
-                data = json.dumps(request).encode('utf-8')
+                data = encode_json(request)
                 self.socket.sendall(data)
                 
-                # Receive response
-                response_data = b""
-                self.socket.settimeout(SOCKET_TIMEOUT)
+                # Receive response (timeout was set once in connect())
+                # into the preallocated buffer instead of a new bytes per recv
+                received = 0
                 
                 while True:
-                    chunk = self.socket.recv(4096)
-                    if not chunk:
+                    if received == len(self.rx_buffer):
+                        self._grow_rx_buffer()
+                    
+                    n = self.socket.recv_into(self.rx_view[received:])
+                    if not n:
                         break
-                    response_data += chunk
+                    received += n
                     # Try to parse what we have so far
                     try:
-                        return json.loads(response_data.decode('utf-8'))
-                    except json.JSONDecodeError:
+                        return decode_json(self.rx_view[:received])
+                    except (json.JSONDecodeError, UnicodeDecodeError):
                         # Incomplete JSON, wait for more data
                         continue
                 
-                if response_data:
-                    return json.loads(response_data.decode('utf-8'))
+                if received:
+                    return decode_json(self.rx_view[:received])
             
             except socket.timeout:
                 logger.debug("Socket timeout during communication")
@@ -194,6 +222,12 @@ class HostConnection:
         
         return None
     
+    def _grow_rx_buffer(self) -> None:
+        """Double the receive buffer for responses larger than it"""
+        self.rx_view.release()
+        self.rx_buffer.extend(bytes(len(self.rx_buffer)))
+        self.rx_view = memoryview(self.rx_buffer)
+    
     def disconnect(self) -> None:
         """Disconnect from host"""
         with self.lock:
@@ -237,7 +271,7 @@ class DataWorker(QObject):
                 self.reconnect_timer += 1
                 
                 if self.reconnect_timer >= (RECONNECT_INTERVAL / 100):
-                    logger.debug(f"Reconnect attempt {self.connection.reconnect_attempts + 1}...")
+                    logger.debug("Reconnect attempt %d...", self.connection.reconnect_attempts + 1)
                     connected = self.connection.connect()
                     self.connection_changed.emit(connected)
                     self.reconnect_timer = 0
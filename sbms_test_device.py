@@ -25,6 +25,13 @@ HOST_IP = "127.0.0.1"
 BLUETOOTH_PORT = 5555  # TCP fallback port
 SOCKET_TIMEOUT = 5  # seconds
 
+# Sent by menu option 4; treated as read-only
+TEST_CONTACTS = (
+    {"phone": "+46701234567", "name": "Alice Andersson"},
+    {"phone": "+46702345678", "name": "Bob Bergstrom"},
+    {"phone": "+46703456789", "name": "Charlie Carlson"},
+)
+
 # ============================================================================
 # Device Client
 # ============================================================================
@@ -195,15 +202,10 @@ def main():
             elif choice == "4":
                 if device.connected:
                     # Example: sync some test contacts
-                    test_contacts = [
-                        {"phone": "+46701234567", "name": "Alice Andersson"},
-                        {"phone": "+46702345678", "name": "Bob Bergstrom"},
-                        {"phone": "+46703456789", "name": "Charlie Carlson"}
-                    ]
-                    print(f"\n[INFO] Syncing {len(test_contacts)} contacts...")
-                    for contact in test_contacts:
+                    print(f"\n[INFO] Syncing {len(TEST_CONTACTS)} contacts...")
+                    for contact in TEST_CONTACTS:
                         print(f"  - {contact['name']} ({contact['phone']})")
-                    device.sync_contacts(test_contacts)
+                    device.sync_contacts(list(TEST_CONTACTS))
                 else:
                     print("[ERROR] Not connected. Connect first.")
             
@@ -11,6 +11,8 @@ Date: December 2025
 Requirements:
 - Python 3.8+
 - sqlite3 (builtin)
+- orjson (optional, faster message encoding: pip install orjson)
+- msgpack (optional, smaller contact syncs: pip install msgpack)
 
 Usage:
 ```bash
@@ -24,10 +26,21 @@ import json
 import sqlite3
 import logging
 import os
+import struct
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # ============================================================================
 # Configuration
 # ============================================================================
@@ -35,10 +48,33 @@ from pathlib import Path
 BLUETOOTH_PORT = 5555
 TCP_PORT = 9999
 BIND_HOST = "127.0.0.1"
+RECV_BUFFER_SIZE = 65536  # bytes buffered per device read
+
+# Framed devices send a 4-byte big-endian length before each JSON payload
+FRAME_HEADER = struct.Struct('>I')
+MAX_FRAME_SIZE = 16 * 1024 * 1024
 
 DB_PATH = "sbms_host.db"
+DB_MMAP_SIZE = 64 * 1024 * 1024  # bytes of the database file mapped into memory
 LOG_FILE = "sbms_host.log"
 
+# ============================================================================
+# Message Encoding
+# ============================================================================
+
+if orjson is not None:
+    # C codec producing UTF-8 bytes directly; NON_STR_KEYS because
+    # responses are keyed by phone, which a device may leave null
+    def encode_json(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    
+    decode_json = orjson.loads
+else:
+    def encode_json(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    decode_json = json.loads
+
 # ============================================================================
 # Logging Setup
 # ============================================================================
@@ -62,12 +98,57 @@ class Database:
     
     def __init__(self, path: str):
         self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._changes_base = 0  # rows changed through connections since closed
         self.init_db()
     
+    def _connection(self) -> sqlite3.Connection:
+        """Return the shared connection, opening it on first use"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn = conn
+        return self._conn
+    
+    def _reset(self) -> None:
+        """Drop the shared connection so the next call reopens it"""
+        if self._conn is not None:
+            self._changes_base += self._conn.total_changes
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+    
+    def changes(self) -> int:
+        """Count of rows written so far; grows with every committed write
+        
+        All writes go through the shared connection, so unlike the file
+        mtime this also moves while WAL commits sit in the -wal file.
+        """
+        with self._lock:
+            conn = self._conn
+            return self._changes_base + (conn.total_changes if conn is not None else 0)
+    
+    def close(self) -> None:
+        """Close the shared connection"""
+        with self._lock:
+            self._reset()
+    
     def init_db(self) -> None:
         """Initialize database schema"""
-        conn = sqlite3.connect(self.path)
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                self._create_tables(conn.cursor())
+        logger.info(f"Database initialized: {self.path}")
+    
+    def _create_tables(self, cursor: sqlite3.Cursor) -> None:
+        """Create tables that do not exist yet"""
         
         # Devices table
         cursor.execute("""
@@ -108,38 +189,53 @@ class Database:
             FOREIGN KEY(device_id) REFERENCES devices(id)
         )
         """)
-        
-        conn.commit()
-        conn.close()
-        logger.info(f"Database initialized: {self.path}")
     
     def execute(self, query: str, params: Tuple = ()) -> List:
         """Execute query and return results"""
-        try:
-            conn = sqlite3.connect(self.path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            result = cursor.fetchall()
-            conn.commit()
-            conn.close()
-            return result
-        except Exception as e:
-            logger.error(f"Database error: {e}")
-            return []
+        with self._lock:
+            try:
+                conn = self._connection()
+                with conn:
+                    return conn.execute(query, params).fetchall()
+            except sqlite3.OperationalError as e:
+                self._reset()
+                logger.error(f"Database error: {e}")
+                return []
+            except Exception as e:
+                logger.error(f"Database error: {e}")
+                return []
     
     def insert(self, query: str, params: Tuple = ()) -> bool:
         """Insert record"""
-        try:
-            conn = sqlite3.connect(self.path)
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            conn.close()
-            return True
-        except Exception as e:
-            logger.error(f"Database insert error: {e}")
-            return False
+        with self._lock:
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.execute(query, params)
+                return True
+            except sqlite3.OperationalError as e:
+                self._reset()
+                logger.error(f"Database insert error: {e}")
+                return False
+            except Exception as e:
+                logger.error(f"Database insert error: {e}")
+                return False
+    
+    def insert_many(self, query: str, rows: List[Tuple]) -> bool:
+        """Insert many records with one prepared statement and one commit"""
+        with self._lock:
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(query, rows)
+                return True
+            except sqlite3.OperationalError as e:
+                self._reset()
+                logger.error(f"Database insert error: {e}")
+                return False
+            except Exception as e:
+                logger.error(f"Database insert error: {e}")
+                return False
 
 
 # ============================================================================
@@ -152,31 +248,47 @@ class DeviceHandler(threading.Thread):
     def __init__(self, client_socket: socket.socket, addr: Tuple, db: Database):
         super().__init__()
         self.client_socket = client_socket
+        self.rfile = None
         self.addr = addr
         self.db = db
         self.device_id = None
         self.device_name = None
+        self.framed = True
+        self.contacts_hash = None  # hash of the last contact list applied
+        self.msgpack = False  # device may send msgpack frames
         self.running = True
         self.daemon = True
     
     def run(self) -> None:
         """Handle device connection"""
         try:
-            self.client_socket.settimeout(30)
+            # Read through a 64 KiB userland buffer so a large sync payload
+            # arrives in one read instead of 4096-byte recv() calls. The
+            # socket stays blocking: a socket file cannot be read again
+            # after a timeout, and idle timeouts were only ever logged
+            self.rfile = self.client_socket.makefile('rb', buffering=RECV_BUFFER_SIZE)
+            
+            # Legacy devices send bare JSON objects; anything else is framed
+            self.framed = self.rfile.peek(1)[:1] != b'{'
             
             while self.running:
                 try:
-                    data = self.client_socket.recv(4096).decode('utf-8')
-                    
-                    if not data:
-                        break
+                    if self.framed:
+                        msg = self._read_frame()
+                        
+                        if msg is None:
+                            break
+                    else:
+                        data = self.rfile.read1(RECV_BUFFER_SIZE)
+                        
+                        if not data:
+                            break
+                        
+                        # Parse JSON message
+                        msg = decode_json(data)
                     
-                    # Parse JSON message
-                    msg = json.loads(data)
                     self._handle_message(msg)
                 
-                except socket.timeout:
-                    logger.debug(f"Device {self.device_id} timeout")
                 except json.JSONDecodeError as e:
                     logger.warning(f"Invalid JSON from {self.addr}: {e}")
                 except Exception as e:
@@ -186,6 +298,35 @@ class DeviceHandler(threading.Thread):
         finally:
             self.disconnect()
     
+    def _read_frame(self) -> Optional[Dict]:
+        """Read one length-prefixed JSON message, None when device hangs up"""
+        header = self.rfile.read(FRAME_HEADER.size)
+        
+        if len(header) < FRAME_HEADER.size:
+            return None
+        
+        (length,) = FRAME_HEADER.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            raise ValueError(f"Frame too large: {length} bytes")
+        
+        payload = self.rfile.read(length)
+        
+        if len(payload) < length:
+            return None
+        
+        # JSON messages always start with '{'; anything else is msgpack
+        if self.msgpack and payload[:1] != b'{':
+            return msgpack.unpackb(payload)
+        
+        return decode_json(payload)
+    
+    def _send(self, msg: Dict) -> None:
+        """Send message to device, framed if the device frames its own"""
+        data = encode_json(msg)
+        if self.framed:
+            data = FRAME_HEADER.pack(len(data)) + data
+        self.client_socket.sendall(data)
+    
     def _handle_message(self, msg: Dict) -> None:
         """Handle incoming message from device"""
         msg_type = msg.get('type')
@@ -195,15 +336,35 @@ class DeviceHandler(threading.Thread):
             self.device_name = msg.get('device')
             self._register_device()
             logger.info(f"Device identified: {self.device_name} ({self.device_id})")
+            
+            if msgpack is not None and self.framed and 'msgpack' in msg.get('formats', ()):
+                self.msgpack = True
+                self._send({"type": "format", "format": "msgpack"})
         
-        elif msg_type == 'ping':
+        elif msg_type in ('ping', 'sync_ping'):
+            # sync_ping: contacts unchanged since the last sync_contacts
             self._update_device_status()
         
         elif msg_type == 'sync_contacts':
             contacts = msg.get('contacts', [])
             self._sync_contacts(contacts)
+            self.contacts_hash = msg.get('hash')
             logger.info(f"Synced {len(contacts)} contacts from {self.device_name}")
         
+        elif msg_type == 'sync_contacts_delta':
+            # A delta only applies on top of the list it was computed from
+            if self.contacts_hash is None or msg.get('base_hash') != self.contacts_hash:
+                logger.warning(f"Contact delta from {self.device_name} has a stale base, requesting resync")
+                self.contacts_hash = None
+                self._send({"type": "resync"})
+                return
+            
+            added = msg.get('added', [])
+            removed = msg.get('removed', [])
+            self._apply_contacts_delta(added, removed)
+            self.contacts_hash = msg.get('hash')
+            logger.info(f"Synced contacts from {self.device_name} (+{len(added)} -{len(removed)})")
+        
         elif msg_type == 'send_message':
             msg_id = msg.get('id')
             to_number = msg.get('to')
@@ -216,6 +377,14 @@ class DeviceHandler(threading.Thread):
             status = msg.get('status')
             self._update_message_status(msg_id, status)
             logger.info(f"Message {msg_id} status: {status}")
+        
+        elif msg_type == 'sms_status_batch':
+            entries = msg.get('entries', [])
+            query = "UPDATE messages SET status = ? WHERE id = ?"
+            self.db.insert_many(query, [
+                (entry.get('status'), entry.get('id')) for entry in entries
+            ])
+            logger.info(f"Updated status of {len(entries)} messages from {self.device_name}")
     
     def _register_device(self) -> None:
         """Register device in database"""
@@ -243,19 +412,36 @@ class DeviceHandler(threading.Thread):
         query = "DELETE FROM contacts WHERE device_id = ?"
         self.db.insert(query, (self.device_id,))
         
-        # Insert new contacts
-        for contact in contacts:
+        # Insert new contacts (one timestamp for the whole sync batch)
+        added = datetime.now().isoformat()
+        query = """
+        INSERT INTO contacts (device_id, name, phone, added, last_contact)
+        VALUES (?, ?, ?, ?, ?)
+        """
+        self.db.insert_many(query, [
+            (self.device_id, contact.get('name'), contact.get('phone'), added, None)
+            for contact in contacts
+        ])
+    
+    def _apply_contacts_delta(self, added: List[Dict], removed: List[Dict]) -> None:
+        """Apply added/removed contacts on top of the device's stored list"""
+        if removed:
+            query = "DELETE FROM contacts WHERE device_id = ? AND name = ? AND phone = ?"
+            self.db.insert_many(query, [
+                (self.device_id, contact.get('name'), contact.get('phone'))
+                for contact in removed
+            ])
+        
+        if added:
+            now = datetime.now().isoformat()
             query = """
             INSERT INTO contacts (device_id, name, phone, added, last_contact)
             VALUES (?, ?, ?, ?, ?)
             """
-            self.db.insert(query, (
-                self.device_id,
-                contact.get('name'),
-                contact.get('phone'),
-                datetime.now().isoformat(),
-                None
-            ))
+            self.db.insert_many(query, [
+                (self.device_id, contact.get('name'), contact.get('phone'), now, None)
+                for contact in added
+            ])
     
     def _queue_message(self, msg_id: str, to_number: str, text: str) -> None:
         """Queue message for sending"""
@@ -285,6 +471,8 @@ class DeviceHandler(threading.Thread):
                 query = "UPDATE devices SET status = ? WHERE id = ?"
                 self.db.insert(query, ('offline', self.device_id))
                 logger.info(f"Device {self.device_name} disconnected")
+            if self.rfile:
+                self.rfile.close()
             self.client_socket.close()
         except Exception as e:
             logger.error(f"Error disconnecting: {e}")
@@ -301,6 +489,9 @@ class SBMSHost:
         self.db = Database(DB_PATH)
         self.devices = {}
         self.running = False
+        self._stop_event = threading.Event()
+        self._contacts_response = None
+        self._contacts_changes = None
     
     def start(self) -> None:
         """Start SBMS host"""
@@ -328,9 +519,9 @@ class SBMSHost:
         logger.info("")
         
         try:
+            # Short timeout keeps Ctrl+C responsive; stop() wakes it at once
             while self.running:
-                import time
-                time.sleep(1)
+                self._stop_event.wait(1)
         except KeyboardInterrupt:
             self.stop()
     
@@ -349,6 +540,10 @@ class SBMSHost:
                     client_socket, addr = server.accept()
                     logger.info(f"Device connection from {addr}")
                     
+                    # Handlers block on reads with no timeout; keepalive lets
+                    # the OS notice a device that vanished without a FIN
+                    client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                    
                     handler = DeviceHandler(client_socket, addr, self.db)
                     handler.start()
                     
@@ -411,10 +606,10 @@ class SBMSHost:
                 if not data:
                     break
                 
-                msg = json.loads(data)
+                msg = decode_json(data)
                 response = self._handle_control_request(msg)
                 
-                client_socket.sendall(json.dumps(response).encode('utf-8'))
+                client_socket.sendall(encode_json(response))
         
         except socket.timeout:
             pass
@@ -432,33 +627,45 @@ class SBMSHost:
         msg_type = msg.get('type')
         
         if msg_type == 'get_status':
-            devices = self.db.execute("SELECT COUNT(*) as count FROM devices WHERE status = 'online'")
-            contacts = self.db.execute("SELECT COUNT(*) as count FROM contacts")
-            messages = self.db.execute("SELECT COUNT(*) as count FROM messages")
+            # One connection and one statement for all three counters
+            counts = self.db.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM devices WHERE status = 'online') AS devices,
+                (SELECT COUNT(*) FROM contacts) AS contacts,
+                (SELECT COUNT(*) FROM messages) AS messages
+            """)
+            row = counts[0] if counts else None
             
             return {
                 'status': 'ok',
-                'devices_connected': devices[0]['count'] if devices else 0,
-                'contacts_count': contacts[0]['count'] if contacts else 0,
-                'messages_count': messages[0]['count'] if messages else 0
+                'devices_connected': row['devices'] if row else 0,
+                'contacts_count': row['contacts'] if row else 0,
+                'messages_count': row['messages'] if row else 0
             }
         
         elif msg_type == 'get_contacts':
+            # Control Center polls this constantly; reuse the last response
+            # until something is written to the database
+            changes = self.db.changes()
+            if self._contacts_response is not None and changes == self._contacts_changes:
+                return self._contacts_response
+            
             contacts = self.db.execute("""
             SELECT phone, name, added, last_contact
             FROM contacts
             ORDER BY name
             """)
             
-            data = {}
-            for contact in contacts:
-                data[contact['phone']] = {
-                    'name': contact['name'],
-                    'added': contact['added'],
-                    'last_contact': contact['last_contact']
-                }
+            # Rows unpack positionally in SELECT order, instead of resolving
+            # each column by name on every row
+            data = {
+                phone: {'name': name, 'added': added, 'last_contact': last_contact}
+                for phone, name, added, last_contact in contacts
+            }
             
-            return {'status': 'ok', 'data': data}
+            self._contacts_response = {'status': 'ok', 'data': data}
+            self._contacts_changes = changes
+            return self._contacts_response
         
         elif msg_type == 'get_messages':
             messages = self.db.execute("""
@@ -468,15 +675,16 @@ class SBMSHost:
             LIMIT 100
             """)
             
-            data = {}
-            for msg in messages:
-                data[msg['id']] = {
-                    'to_number': msg['to_number'],
-                    'text': msg['text'],
-                    'status': msg['status'],
-                    'timestamp': msg['timestamp'],
-                    'retry_count': msg['retry_count']
+            data = {
+                msg_id: {
+                    'to_number': to_number,
+                    'text': text,
+                    'status': status,
+                    'timestamp': timestamp,
+                    'retry_count': retry_count
                 }
+                for msg_id, to_number, text, status, timestamp, retry_count in messages
+            }
             
             return {'status': 'ok', 'data': data}
         
@@ -510,6 +718,8 @@ class SBMSHost:
         logger.info("="*70)
         
         self.running = False
+        self._stop_event.set()
+        self.db.close()
 
 
 # ============================================================================
@@ -10,6 +10,8 @@ Requires:
 - Shizuku app running
 - rish binary for Shizuku commands
 - Python 3.10+
+- orjson (optional, faster message encoding: pip install orjson)
+- msgpack (optional, smaller contact syncs: pip install msgpack)
 
 Author: Alex Jonsson
 Location: Stockholm, Sweden
@@ -22,15 +24,37 @@ python sbms_zfold6.py --host WINDOWS_IP
 ```
 """
 
+import atexit
+import errno
+import hashlib
 import json
+import select
+import selectors
+import shlex
 import socket
+import struct
 import sys
 import time
+import threading
 import logging
+import logging.handlers
 import subprocess
 import os
-from datetime import datetime
-from typing import Dict, List, Optional
+import queue
+import random
+import re
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 # ============================================================================
 # Configuration
@@ -41,39 +65,181 @@ DEFAULT_WINDOWS_PORT = 5555
 DEVICE_NAME = "Z Fold 6"
 
 # Timers
-RECONNECT_INTERVAL = 5
-PING_INTERVAL = 10
+RECONNECT_INTERVAL = 5       # first retry; doubles while the host is unreachable
+MAX_RECONNECT_INTERVAL = 60
+PING_INTERVAL = 60  # liveness for the host UI; TCP keepalive detects dead peers
 SYNC_INTERVAL = 30
+MIN_SYNC_INTERVAL = 5
+MAX_SYNC_INTERVAL = 600
+STATUS_FLUSH_INTERVAL = 0.5  # SMS status reports are batched this long...
+STATUS_BATCH_SIZE = 64       # ...or until this many are waiting
 
 # Socket settings
 SOCKET_TIMEOUT = 2
-MAX_RECV_SIZE = 4096
+LOCAL_CONNECT_TIMEOUT = 0.5  # host on loopback answers immediately or not at all
+
+# TCP keepalive: first probe after 60s idle, then every 20s, give up after 3
+KEEPALIVE_IDLE = 60
+KEEPALIVE_INTERVAL = 20
+KEEPALIVE_COUNT = 3
+# Unacknowledged data aborts the connection after the same 2 minutes
+# instead of the kernel's ~15 minutes of retransmits
+USER_TIMEOUT_MS = (KEEPALIVE_IDLE + KEEPALIVE_INTERVAL * KEEPALIVE_COUNT) * 1000
+
+# The TCP options above exist on Linux/Android; elsewhere (e.g. next to
+# the Windows host) whichever are missing keep the system defaults
+TCP_TUNING = [
+    (getattr(socket, name), value)
+    for name, value in (
+        ("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+        ("TCP_KEEPCNT", KEEPALIVE_COUNT),
+        ("TCP_USER_TIMEOUT", USER_TIMEOUT_MS),
+    )
+    if hasattr(socket, name)
+]
+
+# sendmsg() is missing on Windows and MSG_NOSIGNAL outside Linux; Python
+# ignores SIGPIPE anyway, so the flag is only a belt-and-braces extra
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+SEND_FLAGS = getattr(socket, "MSG_NOSIGNAL", 0)
+MAX_RECV_SIZE = 16384
+MAX_MSGS_PER_TICK = 16   # frames handled per loop iteration
+MAX_DRAIN_MS = 10        # time budget for handling them
+
+# Framing: each message is a 4-byte big-endian length + UTF-8 JSON payload
+FRAME_HEADER = struct.Struct('>I')
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+SEND_IOV_MAX = 1024  # buffers per sendmsg() call (Linux IOV_MAX)
+
+# sync_contacts frame is written around the already-encoded contacts array
+SYNC_CONTACTS_PREFIX = b'{"type":"sync_contacts","contacts":'
+SYNC_CONTACTS_HASH = b',"hash":"%s"}'
 
 # Paths
 BASE_PATH = os.path.expanduser("~/.sbms")
 LOG_FILE = os.path.join(BASE_PATH, "zfold6.log")
 CONTACTS_CACHE = os.path.join(BASE_PATH, "contacts_cache.json")
 
+# Contact query results simply expire; without root there is no change signal
+CONTACTS_TTL = 15  # seconds a contact query result is reused
+
 # Shizuku
 RISH_PATH = os.path.join(BASE_PATH, "rish")  # rish binary in same directory
+RISH_DONE_MARKER = b"__SBMS_DONE__"  # ends each command in the rish session
+
+# One `content query` field: "col=value" where the value runs up to the
+# next ", col=" (so commas inside display names survive) or end of line
+CONTENT_FIELD = re.compile(r'(\w+)=(.*?)(?=, \w+=|$)')
+
+# Formatting characters stripped from phone numbers (spaces, dashes,
+# parentheses, tabs, no-break spaces) in one C-level str.translate()
+PHONE_STRIP = str.maketrans('', '', ' -()\t\u00a0')
 
 # Create directories
 os.makedirs(BASE_PATH, exist_ok=True)
 
+# ============================================================================
+# Message Encoding
+# ============================================================================
+
+if orjson is not None:
+    # C encoder that returns UTF-8 bytes directly; loads() reads any
+    # buffer, so frames are decoded straight out of the receive buffer
+    encode_json = orjson.dumps
+    decode_json = orjson.loads
+else:
+    def encode_json(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    def decode_json(data):
+        # json.loads() rejects memoryview; bytes() is a no-op for bytes
+        return json.loads(bytes(data))
+
+
+def encode_frame(msg: Dict) -> bytes:
+    """Encode message with its length prefix"""
+    data = encode_json(msg)
+    return FRAME_HEADER.pack(len(data)) + data
+
+
+# Constant messages are encoded once and reused for every send
+PING_FRAME = encode_frame({"type": "ping"})
+IDENTIFY_FRAME = encode_frame({
+    "type": "identify",
+    "device": DEVICE_NAME,
+    "version": "1.0",
+    # Offered to the host, which answers with a "format" message
+    "formats": ["msgpack"] if msgpack is not None else []
+})
+SMS_STATUS_ENTRY = b'{"id":%s,"status":%s,"timestamp":"%s"}'
+SMS_STATUS_BATCH_PREFIX = b'{"type":"sms_status_batch","entries":['
+SMS_STATUS_BATCH_SUFFIX = b']}'
+
+if msgpack is not None:
+    # msgpack sync_contacts: a 3-entry map written around the packed
+    # contacts array, like SYNC_CONTACTS_PREFIX for JSON
+    SYNC_CONTACTS_MSGPACK_PREFIX = (b'\x83' + msgpack.packb("type") + msgpack.packb("sync_contacts")
+                                    + msgpack.packb("contacts"))
+    SYNC_CONTACTS_MSGPACK_HASH = msgpack.packb("hash")
+
+_timestamp_second = -1
+_timestamp_text = b""
+
+
+def timestamp_now() -> bytes:
+    """Local ISO-8601 timestamp (second precision), rebuilt once a second"""
+    global _timestamp_second, _timestamp_text
+    
+    now = int(time.time())
+    if now != _timestamp_second:
+        _timestamp_text = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now)).encode()
+        _timestamp_second = now
+    return _timestamp_text
+
 # ============================================================================
 # Logging Setup
 # ============================================================================
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# DEBUG output is opt-in: --verbose, or SBMS_DEBUG=1 python sbms_zfold6.py ...
+LOG_LEVEL = logging.DEBUG if os.environ.get("SBMS_DEBUG") == "1" else logging.INFO
+LOG_MAX_BYTES = 1_000_000  # rotate the log file at this size...
+LOG_BACKUP_COUNT = 3       # ...keeping this many old files
+
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT),
+    logging.StreamHandler(sys.stdout)
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+# Callers only enqueue records; a background thread formats them and does
+# the file and terminal writes, so slow flash never stalls the client loop
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# Only the message is rendered on the caller's thread; timestamp and level
+# are added by the handlers above
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
+logging.basicConfig(level=LOG_LEVEL, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
+
+def stop_logging() -> None:
+    """Write out queued log records and stop the logging thread"""
+    global _log_listener
+    
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+atexit.register(stop_logging)
+
 # ============================================================================
 # Shizuku Integration via rish
 # ============================================================================
@@ -84,35 +250,115 @@ class ShizukuRish:
     rish is a Shizuku helper that executes commands with elevated privileges.
     """
     
+    # Long-lived rish shell shared by run_in_session() calls; the lock
+    # keeps two callers from interleaving commands on its pipes
+    _session: Optional[subprocess.Popen] = None
+    _lock = threading.Lock()
+    _DONE_RE = re.compile(re.escape(RISH_DONE_MARKER) + rb" (\d+)\n")
+    
     @staticmethod
-    def run_command(cmd: str, timeout: int = 10) -> Optional[str]:
+    def run_in_session(cmd: str, timeout: int = 10,
+                       line_callback: Optional[Callable[[str], None]] = None) -> Optional[str]:
         """
-        Run command through Shizuku via rish.
+        Run command in a persistent rish shell.
+        
+        Saves the rish process spawn and Shizuku handshake per call. The
+        command's output is read up to a marker line carrying its exit
+        status; a dead or stuck shell is killed and respawned next call.
         
-        Usage:
-            output = ShizukuRish.run_command("content query --uri ...")
+        With line_callback, each complete output line is passed to it as
+        it arrives instead of being collected, and "" is returned on
+        success. None still means failure, so the caller should discard
+        anything it gathered.
         """
-        try:
-            # Use rish to execute with Shizuku privileges
-            result = subprocess.run(
-                [RISH_PATH, "sh", "-c", cmd],
-                capture_output=True,
-                timeout=timeout,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                return result.stdout
-            else:
-                logger.debug(f"Command failed: {result.stderr}")
+        with ShizukuRish._lock:
+            try:
+                session = ShizukuRish._session
+                if session is None or session.poll() is not None:
+                    session = subprocess.Popen(
+                        [RISH_PATH, "sh"],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                        bufsize=0
+                    )
+                    ShizukuRish._session = session
+                
+                # Commands never read the session's stdin
+                script = f"{{\n{cmd}\n}} </dev/null\necho {RISH_DONE_MARKER.decode()} $?\n"
+                session.stdin.write(script.encode('utf-8'))
+                
+                fd = session.stdout.fileno()
+                output = bytearray()
+                scanned = 0
+                deadline = time.monotonic() + timeout
+                
+                while True:
+                    # Only the tail can hold a marker not seen on the last pass
+                    done = ShizukuRish._DONE_RE.search(output, max(0, scanned - 32))
+                    if done:
+                        break
+                    
+                    if line_callback is not None:
+                        # Hand over complete lines; the tail may be a partial marker
+                        end = output.rfind(b'\n') + 1
+                        if end:
+                            ShizukuRish._emit_lines(output[:end], line_callback)
+                            del output[:end]
+                    scanned = len(output)
+                    
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                        raise TimeoutError(f"no reply within {timeout}s")
+                    
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        raise EOFError("rish session exited")
+                    output.extend(chunk)
+                
+                if done.group(1) != b"0":
+                    logger.debug("Command failed with status %s", done.group(1).decode())
+                    return None
+                
+                if line_callback is not None:
+                    ShizukuRish._emit_lines(output[:done.start()], line_callback)
+                    return ""
+                
+                return output[:done.start()].decode('utf-8', errors='replace')
+            
+            except FileNotFoundError:
+                logger.error(f"rish not found at {RISH_PATH}")
+                return None
+            except Exception as e:
+                logger.error(f"Failed to run command in rish session: {e}")
+                ShizukuRish.close_session()
                 return None
+    
+    @staticmethod
+    def _emit_lines(data: bytes, line_callback: Callable[[str], None]) -> None:
+        """Decode complete output lines and pass them on one by one
         
-        except FileNotFoundError:
-            logger.error(f"rish not found at {RISH_PATH}")
-            return None
-        except Exception as e:
-            logger.error(f"Failed to run command: {e}")
-            return None
+        Split on '\n' only: str.splitlines() also breaks on U+2028, \x85,
+        \x0b and friends, which may appear inside display names.
+        """
+        lines = data.decode('utf-8', errors='replace').split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        for line in lines:
+            line_callback(line)
+    
+    @staticmethod
+    def close_session() -> None:
+        """Terminate the persistent rish shell, if any"""
+        session = ShizukuRish._session
+        ShizukuRish._session = None
+        
+        if session is not None:
+            try:
+                session.kill()
+                session.wait(timeout=1)
+            except Exception:
+                pass
 
 
 # ============================================================================
@@ -125,15 +371,38 @@ class AndroidContactManager:
     Works on Android 16 without root.
     """
     
+    # SHA-256 of the contact list last written to CONTACTS_CACHE
+    _cached_digest: Optional[str] = None
+    # File mtime and parsed list from the last load/write, so an unchanged
+    # cache file is never parsed twice
+    _cached_mtime: int = 0
+    _cached_list: Optional[List[Dict]] = None
+    # Last query result and when it was taken
+    _memo: Optional[List[Dict]] = None
+    _memo_at: float = 0.0
+    
     @staticmethod
-    def get_contacts() -> List[Dict]:
-        """Get real Android contacts via Shizuku"""
+    def get_contacts(max_age: Optional[float] = None) -> List[Dict]:
+        """Get real Android contacts via Shizuku
+        
+        A result is reused for CONTACTS_TTL seconds, or max_age if that is
+        shorter, instead of re-running the content query. contacts2.db
+        can't be stat()ed without root, so age is the only freshness signal.
+        """
+        now = time.monotonic()
+        max_age = CONTACTS_TTL if max_age is None else min(max_age, CONTACTS_TTL)
+        
+        if (AndroidContactManager._memo is not None
+                and now - AndroidContactManager._memo_at < max_age):
+            return AndroidContactManager._memo
         
         logger.debug("Querying real Android contacts via Shizuku...")
         contacts = AndroidContactManager._query_contacts_shizuku()
         
         if contacts:
             logger.info(f"Retrieved {len(contacts)} real contacts from device")
+            AndroidContactManager._memo = contacts
+            AndroidContactManager._memo_at = now
             return contacts
         
         logger.warning("Failed to get real contacts")
@@ -146,86 +415,131 @@ class AndroidContactManager:
         Uses 'content' command with READ_CONTACTS permission.
         """
         try:
-            # Query contacts from ContactsProvider
+            # One query on the phones view, which already joins each number
+            # with its contact's display name
             cmd = """
-content query --uri content://com.android.contacts/data \
---projection raw_contact_id:data1 \
---where "mimetype='vnd.android.cursor.item/phone_v2'" 2>/dev/null
+content query --uri content://com.android.contacts/data/phones \
+--projection display_name:data1 2>/dev/null
             """
             
-            output = ShizukuRish.run_command(cmd)
+            # Parse rows as they stream in:
+            # Row: 0 display_name=Alice Andersson, data1=+46701234567
+            names = []
+            phones = []
             
-            if not output:
-                return []
-            
-            # Parse phone numbers
-            phone_map = {}  # Map raw_contact_id -> phone
-            
-            for line in output.split('\n'):
-                if 'raw_contact_id=' in line and 'data1=' in line:
-                    # Parse: Row: raw_contact_id=123, data1=+46701234567
-                    parts = {}
-                    for part in line.split(','):
-                        if '=' in part:
-                            k, v = part.split('=', 1)
-                            parts[k.strip()] = v.strip()
-                    
-                    contact_id = parts.get('raw_contact_id')
-                    phone = parts.get('data1', '').replace(' ', '').replace('-', '')
+            def add_row(line: str) -> None:
+                row = AndroidContactManager._parse_row(line)
+                if row:
+                    name = row.get('display_name')
+                    phone = row.get('data1')
                     
-                    if contact_id and phone:
-                        phone_map[contact_id] = phone
+                    if name and phone:
+                        names.append(name)
+                        phones.append(phone)
             
-            # Query contact names
-            cmd2 = """
-content query --uri content://com.android.contacts/raw_contacts \
---projection _id:display_name 2>/dev/null
-            """
-            
-            output2 = ShizukuRish.run_command(cmd2)
-            
-            if not output2:
+            if ShizukuRish.run_in_session(cmd, line_callback=add_row) is None or not phones:
                 return []
             
-            contacts = []
-            seen = set()
+            # Normalize all phone numbers in one pass over a joined buffer
+            # instead of per-row calls
+            phones = '\n'.join(phones).translate(PHONE_STRIP).split('\n')
             
-            for line in output2.split('\n'):
-                if '_id=' in line and 'display_name=' in line:
-                    parts = {}
-                    for part in line.split(','):
-                        if '=' in part:
-                            k, v = part.split('=', 1)
-                            parts[k.strip()] = v.strip()
-                    
-                    contact_id = parts.get('_id')
-                    name = parts.get('display_name')
-                    
-                    if contact_id in phone_map and name:
-                        phone = phone_map[contact_id]
-                        key = f"{name}:{phone}"
-                        
-                        if key not in seen:
-                            contacts.append({
-                                "name": name,
-                                "phone": phone
-                            })
-                            seen.add(key)
-                            logger.debug(f"Found contact: {name} - {phone}")
-            
-            return contacts
+            return AndroidContactManager._dedupe_rows(zip(names, phones))
         
         except Exception as e:
             logger.error(f"Failed to query contacts: {e}")
             return []
     
     @staticmethod
-    def cache_contacts(contacts: List[Dict]) -> None:
-        """Cache contacts to file"""
+    def _dedupe_rows(rows) -> List[Dict]:
+        """Build contacts from (name, phone) pairs, first name per phone wins
+        
+        The normalized number identifies a contact (the host and UI key
+        contacts by phone), so a dict keyed on it both dedupes and keeps
+        insertion order without a separate seen set.
+        """
+        contacts = {}
+        # Checked once, not per contact
+        log_rows = logger.isEnabledFor(logging.DEBUG)
+        
+        for name, phone in rows:
+            if phone and phone not in contacts:
+                contacts[phone] = {
+                    "name": name or "Unknown",
+                    "phone": phone
+                }
+                if log_rows:
+                    logger.debug("Found contact: %s - %s", name, phone)
+        
+        return list(contacts.values())
+    
+    @staticmethod
+    def _parse_row(line: str) -> Optional[Dict[str, str]]:
+        """Parse one `content query` output row into a field dict
+        
+        The line is parsed by one compiled findall() call; columns that
+        content prints as NULL are left out of the row. None for lines
+        that hold no fields.
+        """
+        fields = CONTENT_FIELD.findall(line)
+        if fields:
+            return {k: v for k, v in fields if v != 'NULL'}
+        return None
+    
+    @staticmethod
+    def load_cached_contacts() -> List[Dict]:
+        """Load contacts saved by the last successful sync"""
+        try:
+            mtime = os.stat(CONTACTS_CACHE).st_mtime_ns
+            if mtime == AndroidContactManager._cached_mtime and AndroidContactManager._cached_list is not None:
+                return AndroidContactManager._cached_list
+            
+            with open(CONTACTS_CACHE, 'rb') as f:
+                data = f.read()
+            contacts = decode_json(data)
+            
+            # The file holds the same compact encoding sync_contacts hashes,
+            # so syncing this list again won't rewrite it
+            AndroidContactManager._cached_digest = hashlib.sha256(data).hexdigest()
+            AndroidContactManager._cached_mtime = mtime
+            AndroidContactManager._cached_list = contacts
+            return contacts
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.warning(f"Failed to load cached contacts: {e}")
+            return []
+    
+    @staticmethod
+    def cache_contacts(contacts: List[Dict], digest: Optional[str] = None,
+                       data: Optional[bytes] = None) -> None:
+        """Cache contacts to file, skipping the write when nothing changed
+        
+        data/digest may be passed in when the caller has already encoded
+        and hashed the list.
+        """
+        if data is None:
+            data = encode_json(contacts)
+        if digest is None:
+            digest = hashlib.sha256(data).hexdigest()
+        
+        if digest == AndroidContactManager._cached_digest:
+            return
+        
         try:
-            with open(CONTACTS_CACHE, 'w') as f:
-                json.dump(contacts, f, indent=2)
-            logger.debug(f"Cached {len(contacts)} contacts")
+            # Compact JSON written to a temp file, synced, and renamed into
+            # place, so neither a crash nor power loss leaves a truncated cache
+            tmp_path = CONTACTS_CACHE + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, CONTACTS_CACHE)
+            
+            AndroidContactManager._cached_digest = digest
+            AndroidContactManager._cached_mtime = os.stat(CONTACTS_CACHE).st_mtime_ns
+            AndroidContactManager._cached_list = contacts
+            logger.debug("Cached %d contacts", len(contacts))
         except Exception as e:
             logger.warning(f"Failed to cache contacts: {e}")
 
@@ -249,19 +563,21 @@ class ShizukuSMS:
             True if SMS was sent successfully, False otherwise
         """
         try:
+            phone_number = phone_number.translate(PHONE_STRIP)
             logger.info(f"Sending SMS to {phone_number}")
             logger.info(f"Text: {message_text[:50]}...")
             
             # Method 1: Use am command to open default SMS app
-            # This will send via the system's default SMS app
-            escaped_msg = message_text.replace('"', '\\"').replace("'", "\\'")  
-            cmd = f"""am start -a android.intent.action.SENDTO \
--d sms:{phone_number} \
---es sms_body \"{escaped_msg}\" \
---ez exit_on_sent true 2>/dev/null
-            """
+            # This will send via the system's default SMS app. Commands are
+            # built as argv lists; shlex.join() quotes every argument once
+            argv = [
+                "am", "start", "-a", "android.intent.action.SENDTO",
+                "-d", f"sms:{phone_number}",
+                "--es", "sms_body", message_text,
+                "--ez", "exit_on_sent", "true"
+            ]
             
-            output = ShizukuRish.run_command(cmd)
+            output = ShizukuRish.run_in_session(shlex.join(argv) + " 2>/dev/null")
             
             if output is not None:
                 logger.info(f"SMS sent to {phone_number}")
@@ -269,12 +585,13 @@ class ShizukuSMS:
             
             # Method 2: Fallback - use service call for direct SMS
             logger.debug("Trying fallback SMS method...")
-            cmd2 = f"""service call isms 7 s16 \"com.android.mms\" \
-s16 \"\" s16 \"{phone_number}\" s16 \"\" s16 \"{escaped_msg}\" \
-s16 \"\" s16 \"\" 2>/dev/null
-            """
+            argv2 = [
+                "service", "call", "isms", "7", "s16", "com.android.mms",
+                "s16", "", "s16", phone_number, "s16", "", "s16", message_text,
+                "s16", "", "s16", ""
+            ]
             
-            output2 = ShizukuRish.run_command(cmd2)
+            output2 = ShizukuRish.run_in_session(shlex.join(argv2) + " 2>/dev/null")
             
             if output2 is not None:
                 logger.info(f"SMS queued to {phone_number}")
@@ -298,34 +615,117 @@ class SBMSZFold6Client:
     def __init__(self, host: str, port: int):
         self.host = host
         self.port = port
+        self._addr = None  # getaddrinfo() entry of the last successful connect
         self.socket = None
         self.connected = False
         self.running = False
-        self.reconnect_timer = 0
-        self.ping_timer = 0
-        self.sync_timer = 0
+        self._rxbuf = bytearray()
+        self._sendq: List[bytes] = []
+        self.next_reconnect_at = 0.0
+        self.next_ping_at = 0.0
+        self.next_sync_at = 0.0
+        self.sync_interval = SYNC_INTERVAL
+        self._forced_sync = False  # next sync was requested by the host
+        self.last_contacts = None
+        self._last_sync_hash = None
+        # (name, phone) pairs the host holds, None until a full sync
+        self._synced: Optional[Set[Tuple[str, str]]] = None
+        self._want_write = False  # socket also selected for EVENT_WRITE
+        self._msgpack = False  # host accepted msgpack for sync_contacts
+        self._backoff = RECONNECT_INTERVAL
+        # Encoded sms_status entries waiting for the next batch; kept
+        # across reconnects so no report is dropped while offline
+        self._status_queue: Deque[bytes] = deque()
+        # Entries of batches queued in _sendq but not yet fully written to
+        # the socket; put back in _status_queue if _sendq is discarded
+        self._status_unsent: List[bytes] = []
+        self.next_status_flush_at = 0.0
+        
+        # The loop sleeps in select() on the host socket plus a wake-up
+        # socketpair that stop() writes to
+        self._sel = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._loop_done = threading.Event()  # clear while run() is looping
+        self._loop_done.set()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._sel.register(self._wake_r, selectors.EVENT_READ)
     
     def connect(self) -> bool:
         """Connect to Windows SBMS host"""
         try:
-            if self.socket:
-                try:
-                    self.socket.close()
-                except:
-                    pass
+            self._close_socket()
             
             logger.info(f"Connecting to {self.host}:{self.port}...")
             
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(SOCKET_TIMEOUT)
-            self.socket.connect((self.host, self.port))
+            # Resolve once and reuse the address while it keeps working;
+            # a failed attempt resolves again next time
+            addr = self._addr or socket.getaddrinfo(self.host, self.port, socket.AF_INET, socket.SOCK_STREAM)[0]
+            self._addr = None
+            family, sock_type, proto, _, sockaddr = addr
+            self.socket = socket.socket(family, sock_type, proto)
+            
+            # Non-blocking connect, then wait for writability with select()
+            self.socket.setblocking(False)
+            err = self.socket.connect_ex(sockaddr)
+            
+            if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                raise OSError(err, os.strerror(err))
+            
+            if self.host == "localhost" or self.host.startswith("127."):
+                timeout = LOCAL_CONNECT_TIMEOUT
+            else:
+                timeout = SOCKET_TIMEOUT
+            
+            _, writable, failed = select.select([], [self.socket], [self.socket], timeout)
+            if not writable and not failed:
+                raise socket.timeout("connect timed out")
+            
+            err = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err:
+                # OSError maps ECONNREFUSED to ConnectionRefusedError
+                raise OSError(err, os.strerror(err))
+            
+            # The socket stays non-blocking: flush() queues what the kernel
+            # can't take yet instead of stalling the loop in sendall()
+            
+            # Messages are batched by flush(), so never let Nagle hold them
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             
+            # Let the kernel probe an idle link with empty ACKs instead of
+            # waking the radio for frequent application pings
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for option, value in TCP_TUNING:
+                self.socket.setsockopt(socket.IPPROTO_TCP, option, value)
+            
+            self._addr = addr
             self.connected = True
+            self._rxbuf.clear()
+            self._drop_sendq()
+            self._sel.register(self.socket, selectors.EVENT_READ)
+            self._want_write = False
+            self._msgpack = False
+            # New connection gets the full list, on the base schedule
+            self._last_sync_hash = None
+            self._synced = None
+            self.sync_interval = SYNC_INTERVAL
             logger.info(f"[OK] Connected to Windows host")
             
-            # Identify ourselves
+            # Identify ourselves, and send the last known list in the same
+            # write so the host has contacts before the first sync tick.
+            # The connection is up either way; a failed cached sync is
+            # simply retried by the next scheduled one
             self.identify()
-            return True
+            
+            cached = AndroidContactManager.load_cached_contacts()
+            if cached:
+                if self.last_contacts is None:
+                    self.last_contacts = cached
+                if not self.sync_contacts(cached):
+                    logger.warning("Cached contact sync failed, waiting for next sync")
+            
+            # Only a write error during that sync takes the link down
+            return self.connected
         
         except socket.timeout:
             logger.warning(f"Connection timeout")
@@ -343,30 +743,244 @@ class SBMSZFold6Client:
             return False
     
     def send_message(self, msg: Dict) -> bool:
-        """Send message to host"""
+        """Queue message for host; it goes out on the next flush()"""
         try:
             if not self.connected or not self.socket:
                 return False
             
-            data = json.dumps(msg).encode('utf-8')
-            self.socket.sendall(data)
-            logger.debug(f"[SEND] {msg['type']}")
+            self._queue_frame(encode_json(msg))
+            logger.debug("[SEND] %s", msg['type'])
+            
+            return True
+        
+        except Exception as e:
+            logger.error(f"Failed to send message: {e}")
+            return False
+    
+    def _send_frame(self, frame: bytes, msg_type: str) -> bool:
+        """Queue a pre-encoded frame for host"""
+        if not self.connected or not self.socket:
+            return False
+        
+        self._sendq.append(frame)
+        logger.debug("[SEND] %s", msg_type)
+        return True
+    
+    def _queue_frame(self, *parts: bytes) -> None:
+        """Queue header and payload parts as separate buffers (no copy)"""
+        self._sendq.append(FRAME_HEADER.pack(sum(map(len, parts))))
+        self._sendq.extend(parts)
+    
+    def flush(self) -> bool:
+        """Write queued buffers to host with scatter-gather sendmsg()
+        
+        Never blocks: whatever the socket can't take now stays queued and
+        the selector watches for writability to send the rest.
+        """
+        if not self._sendq:
+            return self.connected
+        
+        try:
+            if not self.connected or not self.socket:
+                self._drop_sendq()
+                return False
+            
+            views = [memoryview(buf) for buf in self._sendq]
+            start = 0
+            
+            try:
+                while start < len(views):
+                    if HAS_SENDMSG:
+                        sent = self.socket.sendmsg(
+                            views[start:start + SEND_IOV_MAX], (), SEND_FLAGS
+                        )
+                    else:
+                        # One buffer per call; send() reports partial
+                        # writes, which sendall() can't on this socket
+                        sent = self.socket.send(views[start], SEND_FLAGS)
+                    
+                    # Skip fully written buffers, trim a partially written one
+                    while start < len(views) and sent >= len(views[start]):
+                        sent -= len(views[start])
+                        start += 1
+                    if sent:
+                        views[start] = views[start][sent:]
             
+            except BlockingIOError:
+                pass
+            
+            self._sendq = views[start:]
+            if not self._sendq:
+                # Every queued status batch has reached the kernel
+                self._status_unsent.clear()
+            self._watch_writable(bool(self._sendq))
             return True
         
         except Exception as e:
             logger.error(f"Failed to send message: {e}")
             self.connected = False
+            self._drop_sendq()
             return False
     
+    def _drop_sendq(self) -> None:
+        """Discard unsent buffers, keeping their status reports for later"""
+        self._sendq.clear()
+        
+        if self._status_unsent:
+            # Resent as soon as a connection is up again; the host applies
+            # statuses idempotently, so a report it did get is harmless
+            self._status_queue.extendleft(reversed(self._status_unsent))
+            self._status_unsent.clear()
+            self.next_status_flush_at = time.monotonic()
+    
+    def _watch_writable(self, enable: bool) -> None:
+        """Add or drop EVENT_WRITE on the host socket's selector entry"""
+        if enable != self._want_write:
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if enable else 0)
+            self._sel.modify(self.socket, events)
+            self._want_write = enable
+    
+    def _drain(self) -> bool:
+        """Read from host and dispatch a bounded batch of frames
+        
+        Returns True if frames are left over for the next iteration, so a
+        burst of host pushes cannot hold off ping/sync/reconnect timers.
+        """
+        try:
+            for _ in range(MAX_MSGS_PER_TICK):
+                try:
+                    chunk = self.socket.recv(MAX_RECV_SIZE)
+                except BlockingIOError:
+                    break
+                if not chunk:
+                    logger.warning("Host closed the connection")
+                    self.connected = False
+                    return False
+                self._rxbuf.extend(chunk)
+        
+        except Exception as e:
+            logger.error(f"Failed to receive from host: {e}")
+            self.connected = False
+            return False
+        
+        # Per-frame lookups bound to locals; the buffer isn't resized
+        # until the batch is done
+        rxbuf = self._rxbuf
+        size = len(rxbuf)
+        rxview = memoryview(rxbuf)
+        unpack_from = FRAME_HEADER.unpack_from
+        header_size = FRAME_HEADER.size
+        handle = self._handle_message
+        monotonic = time.monotonic
+        deadline = monotonic() + MAX_DRAIN_MS / 1000
+        handled = 0
+        pos = 0
+        
+        try:
+            while size - pos >= header_size:
+                if handled >= MAX_MSGS_PER_TICK or monotonic() >= deadline:
+                    return True
+                
+                (length,) = unpack_from(rxbuf, pos)
+                if length > MAX_FRAME_SIZE:
+                    logger.error(f"Frame too large ({length} bytes), disconnecting")
+                    self.connected = False
+                    return False
+                
+                end = pos + header_size + length
+                if size < end:
+                    break
+                
+                try:
+                    msg = decode_json(rxview[pos + header_size:end])
+                except ValueError as e:
+                    logger.warning(f"Invalid frame from host: {e}")
+                else:
+                    if not isinstance(msg, dict):
+                        logger.warning(f"Ignoring non-object frame from host: {type(msg).__name__}")
+                    else:
+                        # One bad message must not end the service loop
+                        try:
+                            handle(msg)
+                        except Exception as e:
+                            logger.error(f"Failed to handle {msg.get('type')!r} from host: {e}")
+                
+                pos = end
+                handled += 1
+        
+        finally:
+            # The buffer can't be resized while a view is exported
+            rxview.release()
+            # Consume handled frames in place, once per batch
+            del rxbuf[:pos]
+        
+        return False
+    
+    def _handle_message(self, msg: Dict) -> None:
+        """Handle message pushed by host"""
+        msg_type = msg.get('type')
+        
+        if msg_type == 'send_sms':
+            self._handle_send_sms(msg)
+        
+        elif msg_type == 'resync':
+            # Host lost track of our list (e.g. delta against a stale base);
+            # send the full list on this iteration
+            logger.info("Host requested full contact resync")
+            self._last_sync_hash = None
+            self._synced = None
+            self._forced_sync = True
+            self.next_sync_at = time.monotonic()
+        
+        elif msg_type == 'format':
+            # Reply to the formats offered in identify
+            self._msgpack = msgpack is not None and msg.get('format') == 'msgpack'
+            logger.debug("Host sync format: %s", msg.get('format'))
+        
+        else:
+            logger.debug("[RECV] %s", msg_type)
+    
+    def _handle_send_sms(self, msg: Dict) -> None:
+        """Send SMS requested by host and report the result"""
+        msg_id = msg.get('id')
+        to_number = msg.get('to')
+        text = msg.get('text', '')
+        
+        sent = bool(to_number) and ShizukuSMS.send_sms(to_number, text)
+        self.report_sms_status(msg_id, 'sent' if sent else 'failed')
+    
+    def report_sms_status(self, msg_id: str, status: str) -> bool:
+        """Queue SMS delivery status for the next sms_status_batch"""
+        if not self._status_queue:
+            self.next_status_flush_at = time.monotonic() + STATUS_FLUSH_INTERVAL
+        
+        self._status_queue.append(SMS_STATUS_ENTRY % (
+            encode_json(msg_id),
+            encode_json(status),
+            timestamp_now()  # ISO text never needs escaping
+        ))
+        
+        if len(self._status_queue) >= STATUS_BATCH_SIZE:
+            self.next_status_flush_at = time.monotonic()
+        return True
+    
+    def _send_status_batch(self) -> bool:
+        """Send every queued SMS status report as one message"""
+        if not self.connected or not self._status_queue:
+            return False
+        
+        entries = b','.join(self._status_queue)
+        count = len(self._status_queue)
+        self._status_unsent.extend(self._status_queue)
+        self._status_queue.clear()
+        
+        self._queue_frame(SMS_STATUS_BATCH_PREFIX, entries, SMS_STATUS_BATCH_SUFFIX)
+        logger.debug("[SEND] sms_status_batch (%d)", count)
+        return True
+    
     def identify(self) -> bool:
         """Identify device to host"""
-        msg = {
-            "type": "identify",
-            "device": DEVICE_NAME,
-            "version": "1.0"
-        }
-        return self.send_message(msg)
+        return self._send_frame(IDENTIFY_FRAME, "identify")
     
     def sync_contacts(self, contacts: List[Dict]) -> bool:
         """Sync Android contacts to Windows host"""
@@ -374,16 +988,51 @@ class SBMSZFold6Client:
             return False
         
         try:
-            msg = {
-                "type": "sync_contacts",
-                "contacts": contacts
-            }
+            packed = self._msgpack
+            body = msgpack.packb(contacts) if packed else encode_json(contacts)
+            digest = hashlib.sha256(body).hexdigest()
+            
+            if digest == self._last_sync_hash:
+                # Host already has this list; confirm it instead of resending
+                return self.send_message({"type": "sync_ping", "hash": digest})
             
-            result = self.send_message(msg)
+            current = {(c['name'], c['phone']) for c in contacts}
+            
+            if self._synced is not None:
+                added = current - self._synced
+                removed = self._synced - current
+            
+            if self._synced is None or len(added) + len(removed) >= len(current):
+                # Reuse the array encoded for the digest instead of encoding twice
+                if packed:
+                    self._queue_frame(SYNC_CONTACTS_MSGPACK_PREFIX, body,
+                                      SYNC_CONTACTS_MSGPACK_HASH, msgpack.packb(digest))
+                else:
+                    self._queue_frame(SYNC_CONTACTS_PREFIX, body, SYNC_CONTACTS_HASH % digest.encode())
+                logger.debug("[SEND] sync_contacts")
+                sent = len(contacts)
+            else:
+                # Host applies the change on top of the list it acknowledged
+                self.send_message({
+                    "type": "sync_contacts_delta",
+                    "base_hash": self._last_sync_hash,
+                    "hash": digest,
+                    "added": [{"name": n, "phone": p} for n, p in added],
+                    "removed": [{"name": n, "phone": p} for n, p in removed]
+                })
+                sent = len(added) + len(removed)
+            
+            result = self.flush()
             
             if result:
-                logger.info(f"Synced {len(contacts)} contacts to host")
-                AndroidContactManager.cache_contacts(contacts)
+                self._last_sync_hash = digest
+                self._synced = current
+                logger.info(f"Synced {len(contacts)} contacts to host ({sent} sent)")
+                if packed:
+                    # The cache file stays JSON
+                    AndroidContactManager.cache_contacts(contacts)
+                else:
+                    AndroidContactManager.cache_contacts(contacts, digest, body)
             
             return result
         
@@ -393,19 +1042,30 @@ class SBMSZFold6Client:
     
     def ping(self) -> bool:
         """Ping host to keep connection alive"""
-        msg = {"type": "ping"}
-        return self.send_message(msg)
+        return self._send_frame(PING_FRAME, "ping")
     
     def disconnect(self) -> None:
         """Disconnect from host"""
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
+        self._close_socket()
         self.connected = False
         logger.info("Disconnected from host")
     
+    def _close_socket(self) -> None:
+        """Unregister the host socket from the selector and close it"""
+        if not self.socket:
+            return
+        
+        try:
+            self._sel.unregister(self.socket)
+        except (KeyError, ValueError):
+            pass
+        
+        try:
+            self.socket.close()
+        except:
+            pass
+        self.socket = None
+    
     def run(self) -> None:
         """Main background service loop"""
         self.running = True
@@ -417,41 +1077,129 @@ class SBMSZFold6Client:
         logger.info(f"Device: {DEVICE_NAME}")
         logger.info("")
         logger.info("Timers:")
-        logger.info(f"  - Reconnect: {RECONNECT_INTERVAL}s")
+        logger.info(f"  - Reconnect: {RECONNECT_INTERVAL}-{MAX_RECONNECT_INTERVAL}s (exponential)")
         logger.info(f"  - Ping: {PING_INTERVAL}s")
-        logger.info(f"  - Sync: {SYNC_INTERVAL}s")
+        logger.info(f"  - Sync: {SYNC_INTERVAL}s (adaptive {MIN_SYNC_INTERVAL}-{MAX_SYNC_INTERVAL}s)")
         logger.info("")
         logger.info("Press Ctrl+C to shutdown...")
         logger.info("="*70)
         logger.info("")
         
-        while self.running:
-            if not self.connected:
-                self.reconnect_timer += 1
-                if self.reconnect_timer >= RECONNECT_INTERVAL:
-                    logger.info("Attempting to reconnect...")
-                    self.connect()
-                    self.reconnect_timer = 0
-            
-            if self.connected:
-                self.ping_timer += 1
-                if self.ping_timer >= PING_INTERVAL:
-                    if not self.ping():
-                        logger.warning("Ping failed, disconnecting")
-                        self.connected = False
-                    self.ping_timer = 0
-                
-                self.sync_timer += 1
-                if self.sync_timer >= SYNC_INTERVAL:
-                    contacts = AndroidContactManager.get_contacts()
-                    if contacts:
-                        if not self.sync_contacts(contacts):
-                            logger.warning("Sync failed, will retry")
-                    else:
-                        logger.warning("No contacts to sync")
-                    self.sync_timer = 0
+        self._loop_done.clear()
+        try:
+            # Deadlines are monotonic timestamps; the loop sleeps until the
+            # nearest one instead of waking every second to count ticks
+            self.next_reconnect_at = time.monotonic()
             
-            time.sleep(1)
+            # Loop-invariant lookups bound once; connection state and deadlines
+            # change inside the loop and stay attributes
+            monotonic = time.monotonic
+            drain = self._drain
+            flush = self.flush
+            select = self._sel.select
+            wake_r = self._wake_r
+            
+            while self.running:
+                now = monotonic()
+                
+                backlog = self.connected and drain()
+                
+                if not self.connected:
+                    if now >= self.next_reconnect_at:
+                        logger.info("Attempting to reconnect...")
+                        if self.connect():
+                            self.next_ping_at = now + PING_INTERVAL
+                            self.next_sync_at = now + self.sync_interval
+                            # A host that accepts and hangs up straight away
+                            # still isn't redialled before RECONNECT_INTERVAL
+                            self._backoff = RECONNECT_INTERVAL
+                            self.next_reconnect_at = now + RECONNECT_INTERVAL
+                        else:
+                            self._schedule_reconnect(now)
+                
+                if self.connected:
+                    if now >= self.next_ping_at:
+                        if not self.ping():
+                            logger.warning("Ping failed, disconnecting")
+                            self.connected = False
+                        self.next_ping_at = now + PING_INTERVAL
+                    
+                    if self.connected and now >= self.next_sync_at:
+                        # Capped below the interval so each scheduled sync sees a
+                        # fresh query; _adapt_sync_interval() needs real changes
+                        contacts = AndroidContactManager.get_contacts(self.sync_interval / 2)
+                        if contacts:
+                            if self.sync_contacts(contacts):
+                                if self._forced_sync:
+                                    # Full resend asked for by the host says
+                                    # nothing about how often contacts change
+                                    self._forced_sync = False
+                                    self.sync_interval = SYNC_INTERVAL
+                                else:
+                                    self._adapt_sync_interval(contacts != self.last_contacts)
+                                self.last_contacts = contacts
+                            else:
+                                logger.warning("Sync failed, will retry")
+                        else:
+                            logger.warning("No contacts to sync")
+                        self.next_sync_at = now + self.sync_interval
+                    
+                    if self._status_queue and now >= self.next_status_flush_at:
+                        self._send_status_batch()
+                    
+                    # Everything queued this iteration goes out in one write;
+                    # a partial write is finished when the socket turns writable
+                    flush()
+                    
+                    if not self.connected:
+                        self._schedule_reconnect(now)
+                
+                if self.connected:
+                    deadline = min(self.next_ping_at, self.next_sync_at)
+                    if self._status_queue:
+                        deadline = min(deadline, self.next_status_flush_at)
+                else:
+                    deadline = self.next_reconnect_at
+                
+                if not self.connected and self.socket:
+                    # A dead socket would keep select() readable until reconnect
+                    self._close_socket()
+                
+                # Leftover frames from a capped drain are handled without sleeping
+                if backlog:
+                    continue
+                
+                # Sleep until the nearest deadline, host data, or stop()
+                timeout = max(0, deadline - monotonic())
+                for key, events in select(timeout):
+                    if key.fileobj is wake_r:
+                        try:
+                            wake_r.recv(4096)
+                        except BlockingIOError:
+                            pass
+                    elif events & selectors.EVENT_WRITE and not flush():
+                        self._schedule_reconnect(monotonic())
+        finally:
+            # stop() waits for this before closing the selector
+            self._loop_done.set()
+    
+    def _schedule_reconnect(self, now: float) -> None:
+        """Set the next reconnect attempt, backing off while the host is down
+        
+        Delays run 5, 10, 20, 40, 60, 60... seconds plus up to 10% jitter,
+        and start over after a successful connect.
+        """
+        delay = self._backoff
+        self._backoff = min(self._backoff * 2, MAX_RECONNECT_INTERVAL)
+        self.next_reconnect_at = now + delay + random.uniform(0, delay * 0.1)
+    
+    def _adapt_sync_interval(self, changed: bool) -> None:
+        """Shrink sync interval while contacts change, back off when idle"""
+        if changed:
+            self.sync_interval = max(MIN_SYNC_INTERVAL, self.sync_interval // 2)
+        else:
+            self.sync_interval = min(MAX_SYNC_INTERVAL, self.sync_interval * 2)
+        logger.debug("Next sync in %ss", self.sync_interval)
     
     def stop(self) -> None:
         """Stop the service"""
@@ -461,9 +1209,26 @@ class SBMSZFold6Client:
         logger.info("="*70)
         
         self.running = False
-        self.disconnect()
+        try:
+            self._wake_w.send(b'x')
+        except OSError:
+            pass
+        # Killing rish only ends a command the loop may be blocked on;
+        # it closes nothing the loop's selector is watching
+        ShizukuRish.close_session()
+
+        # The loop owns the socket, selector and wake-up pair until it
+        # has left select(), so tear them down only after it is done
+        if not self._loop_done.wait(2):
+            logger.warning("Service loop did not exit, leaving its sockets open")
+        else:
+            self.disconnect()
+            self._sel.close()
+            self._wake_r.close()
+            self._wake_w.close()
         
         logger.info("Client stopped")
+        stop_logging()
 
 
 # ============================================================================
@@ -493,9 +1258,17 @@ def main():
         action="store_true",
         help="Test mode: query contacts and send test SMS"
     )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Log debug output, including every contact found"
+    )
     
     args = parser.parse_args()
     
+    if args.verbose or args.test:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
     if args.test:
         logger.info("Running in TEST MODE")
         logger.info("")
@@ -510,6 +1283,7 @@ def main():
         # Test SMS
         logger.info("\nTesting SMS sending...")
         ShizukuSMS.send_sms("+46701234567", "Test SMS from SBMS")
+        ShizukuRish.close_session()
         
         logger.info("\nTest complete")
         return
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for SBMS Z Fold 6 Client contact parsing
+
+Run with: python -m unittest
+"""
+
+import unittest
+from unittest import mock
+
+from sbms_zfold6 import AndroidContactManager, ShizukuRish
+
+
+def fake_session(output: bytes):
+    """run_in_session() stand-in that streams output to line_callback"""
+    def run_in_session(cmd, timeout=10, line_callback=None):
+        ShizukuRish._emit_lines(output, line_callback)
+        return ""
+    return run_in_session
+
+
+class ContactParsingTest(unittest.TestCase):
+    
+    def query(self, output: bytes):
+        with mock.patch.object(ShizukuRish, 'run_in_session', fake_session(output)):
+            return AndroidContactManager._query_contacts_shizuku()
+    
+    def test_line_separator_in_display_name(self):
+        # U+2028 is a line boundary for str.splitlines(), not for content
+        output = "Row: 0 display_name=Ann\u2028Lee, data1=+46 70-111\n".encode('utf-8')
+        
+        self.assertEqual(self.query(output), [{"name": "Ann\u2028Lee", "phone": "+4670111"}])
+    
+    def test_comma_in_display_name(self):
+        output = b"Row: 0 display_name=Lee, Ann, data1=+4670111\nRow: 1 display_name=Bob, data1=NULL\n"
+        
+        self.assertEqual(self.query(output), [{"name": "Lee, Ann", "phone": "+4670111"}])
+
+
+if __name__ == "__main__":
+    unittest.main()